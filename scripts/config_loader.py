@@ -4,7 +4,7 @@ Configuration loader for Kaggle CLI Tools
 Loads all settings from project.yaml
 """
 
-import yaml
+import json
 import os
 from pathlib import Path
 from typing import Dict, Any, List
@@ -13,34 +13,81 @@ class ConfigLoader:
     def __init__(self, config_file: str = "./config/project.yaml"):
         self.config_file = Path(config_file)
         self.config = self.load_config()
+        self._flat = self._flatten(self.config or {})
+        self._path_cache: Dict[str, Path] = {}
+        self._dir_cache: Dict[str, set] = {}
     
     def load_config(self) -> Dict[str, Any]:
-        """Load configuration from YAML file"""
+        """Load configuration from YAML file (via JSON cache when up to date)"""
         if not self.config_file.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_file}")
         
+        cache_file = self.config_file.with_suffix('.yaml.json')
+        try:
+            if cache_file.stat().st_mtime >= self.config_file.stat().st_mtime:
+                with open(cache_file, 'r') as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+        
+        # PyYAML is only needed on a cache miss; importing it dominates cold start
+        import yaml
+        
+        # Prefer the LibYAML-backed loader when PyYAML was built with it
+        SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        
         with open(self.config_file, 'r') as f:
-            return yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
+        
+        self._write_cache(cache_file, config)
+        return config
     
-    def get(self, key_path: str, default=None):
-        """Get config value using dot notation (e.g., 'paths.config_dir')"""
-        keys = key_path.split('.')
-        value = self.config
+    def _write_cache(self, cache_file: Path, config: Dict[str, Any]):
+        """Atomically write parsed config to the JSON cache (best effort)"""
+        try:
+            data = json.dumps(config)
+        except (TypeError, ValueError):
+            return
         
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
+        # Skip configs JSON cannot represent faithfully (e.g. non-string keys)
+        if json.loads(data) != config:
+            return
         
-        return value
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                f.write(data)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _flatten(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Index every nested value by its dot-notation key path"""
+        flat = {}
+        stack = [('', config)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                key_path = f"{prefix}{key}"
+                flat[key_path] = value
+                if isinstance(value, dict):
+                    stack.append((f"{key_path}.", value))
+        return flat
+    
+    def get(self, key_path: str, default=None):
+        """Get config value using dot notation (e.g., 'paths.config_dir')"""
+        return self._flat.get(key_path, default)
     
     def get_path(self, key_path: str) -> Path:
         """Get a path from config and return as Path object"""
-        path_str = self.get(key_path)
-        if path_str is None:
-            raise ValueError(f"Path not found in config: {key_path}")
-        return Path(path_str)
+        path = self._path_cache.get(key_path)
+        if path is None:
+            path_str = self.get(key_path)
+            if path_str is None:
+                raise ValueError(f"Path not found in config: {key_path}")
+            path = self._path_cache[key_path] = Path(path_str)
+        return path
     
     def get_credentials_path(self, service: str) -> Path:
         """Get credentials path for a specific service"""
@@ -105,6 +152,23 @@ class ConfigLoader:
         
         return True
     
+    def _list_dir(self, directory: Path) -> set:
+        """Names in a directory, listed once per loader (see clear_dir_cache)"""
+        key = str(directory)
+        names = self._dir_cache.get(key)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = {entry.name for entry in entries}
+            except OSError:
+                names = set()
+            self._dir_cache[key] = names
+        return names
+    
+    def clear_dir_cache(self):
+        """Forget cached directory listings (e.g. after credentials are added)"""
+        self._dir_cache.clear()
+    
     def ensure_directories(self):
         """Create directories specified in config"""
         dirs_to_create = [
@@ -116,30 +180,50 @@ class ConfigLoader:
         
         for dir_path in dirs_to_create:
             path = self.get_path(dir_path)
-            path.mkdir(parents=True, exist_ok=True)
+            existing = self._list_dir(path.parent)
+            if path.name not in existing:
+                path.mkdir(parents=True, exist_ok=True)
+                existing.add(path.name)
     
     def check_credentials(self) -> Dict[str, bool]:
         """Check if credential files exist"""
-        kaggle_exists = self.get_credentials_path('kaggle').exists()
-        drive_exists = self.get_credentials_path('drive').exists()
+        kaggle_path = self.get_credentials_path('kaggle')
+        drive_path = self.get_credentials_path('drive')
+        
+        # Both usually live in the same directory, which is listed only once
+        kaggle_exists = kaggle_path.name in self._list_dir(kaggle_path.parent)
+        drive_exists = drive_path.name in self._list_dir(drive_path.parent)
         
         return {
             'kaggle': kaggle_exists,
             'drive': drive_exists
         }
 
-# Global config instance
-config = ConfigLoader()
+# Global config instance (created on first use)
+_config = None
+
+def _get_config() -> ConfigLoader:
+    """Return the shared ConfigLoader, loading it on first access"""
+    global _config
+    if _config is None:
+        _config = ConfigLoader()
+    return _config
+
+def __getattr__(name: str):
+    """Resolve the module-level `config` lazily (PEP 562)"""
+    if name == 'config':
+        return _get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Convenience functions
 def get_config(key_path: str, default=None):
     """Get config value using dot notation"""
-    return config.get(key_path, default)
+    return _get_config().get(key_path, default)
 
 def get_path(key_path: str) -> Path:
     """Get path from config"""
-    return config.get_path(key_path)
+    return _get_config().get_path(key_path)
 
 def get_credentials_path(service: str) -> Path:
     """Get credentials path for service"""
-    return config.get_credentials_path(service)
\ No newline at end of file
+    return _get_config().get_credentials_path(service)
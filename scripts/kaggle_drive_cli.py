@@ -6,21 +6,51 @@ Automates syncing, metadata tracking, and workflow management
 
 import os
 import sys
+import csv
 import json
+import hashlib
 import time
 import argparse
+import itertools
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Any
 
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
-import io
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-from config_loader import config, get_config, get_path, get_credentials_path
+import config_loader
+from config_loader import get_config, get_path, get_credentials_path
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+DRIVE_BATCH_LIMIT = 100  # max calls per Drive batch request
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def iter_files(root: Path) -> Iterator[tuple]:
+    """Yield (path, posix path relative to root) for regular files under root"""
+    # DirEntry types come from the directory listing itself, so no extra stat per entry
+    stack = [(str(root), '')]
+    while stack:
+        dir_path, prefix = stack.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, f"{prefix}{entry.name}/"))
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, f"{prefix}{entry.name}"
 
 class KaggleDriveCLI:
     def __init__(self):
@@ -33,11 +63,18 @@ class KaggleDriveCLI:
         
         # Get settings from config
         self.scopes = get_config('google_drive.scopes')
-        self.output_settings = config.get_output_settings()
-        self.polling_settings = config.get_polling_settings()
+        self.output_settings = config_loader.config.get_output_settings()
+        self.polling_settings = config_loader.config.get_polling_settings()
+        self.upload_workers = get_config('google_drive.upload.max_workers', 8)
+        self.simple_upload_max_size = get_config('google_drive.upload.simple_upload_max_size', 5 * 1024 * 1024)
+        self.download_chunk_size = get_config('google_drive.download.chunk_size', 8 * 1024 * 1024)
+        self.history_limit = get_config('cli.history_limit', 1000)
         
         self.metadata = self.load_metadata()
         self.drive_service = None
+        self._creds = None
+        self._thread_local = threading.local()
+        self._drive_folders = self.load_drive_folders()
         
     def load_metadata(self) -> Dict[str, Any]:
         """Load metadata tracking file"""
@@ -51,35 +88,101 @@ class KaggleDriveCLI:
             "last_sync": None
         }
     
+    def load_drive_folders(self) -> Dict[str, str]:
+        """Load the folder path -> Drive ID map saved by setup"""
+        try:
+            with open(self.drive_config, 'r') as f:
+                folders = json.load(f).get('folder_structure', {})
+        except (FileNotFoundError, ValueError, AttributeError):
+            # Missing, empty or corrupt file: treat as not set up yet
+            return {}
+        return {path: folder_id for path, folder_id in folders.items() if folder_id}
+    
     def save_metadata(self):
-        """Save metadata to file"""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2, default=str)
+        """Save metadata to file (atomically, via a temp file)"""
+        if orjson is not None:
+            data = orjson.dumps(self.metadata, default=str, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(self.metadata, indent=2, default=str).encode('utf-8')
+        
+        tmp_file = self.metadata_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, self.metadata_file)
+    
+    @cached_property
+    def token_file(self) -> Path:
+        """OAuth token file for Google Drive"""
+        return get_path('paths.drive_token')
+    
+    @cached_property
+    def credentials_file(self) -> Path:
+        """OAuth client credentials file for Google Drive"""
+        return get_credentials_path('drive')
     
     def authenticate_drive(self) -> Optional[Any]:
         """Authenticate with Google Drive"""
+        if self.drive_service is not None:
+            return self.drive_service
+        
+        # Google client libraries are heavy; only import them when Drive is used
+        from google.auth.exceptions import RefreshError
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
         creds = None
-        token_file = get_path('paths.drive_token')
-        credentials_file = get_credentials_path('drive')
+        token_file = self.token_file
+        credentials_file = self.credentials_file
         
         if token_file.exists():
             creds = Credentials.from_authorized_user_file(str(token_file), self.scopes)
         
         if not creds or not creds.valid:
-            if not credentials_file.exists():
-                print(f"❌ ERROR: {credentials_file.name} not found in {credentials_file.parent}/")
-                print("📥 Download from: https://console.cloud.google.com/apis/credentials")
-                return None
+            if creds and creds.expired and creds.refresh_token:
+                # Refresh silently instead of re-running the browser flow
+                try:
+                    creds.refresh(Request())
+                except RefreshError:
+                    # Revoked or expired refresh token: fall back to the browser flow
+                    creds = None
             
-            flow = InstalledAppFlow.from_client_secrets_file(str(credentials_file), self.scopes)
-            creds = flow.run_local_server(port=0)
+            if not creds or not creds.valid:
+                if not credentials_file.exists():
+                    print(f"❌ ERROR: {credentials_file.name} not found in {credentials_file.parent}/")
+                    print("📥 Download from: https://console.cloud.google.com/apis/credentials")
+                    return None
+                
+                flow = InstalledAppFlow.from_client_secrets_file(str(credentials_file), self.scopes)
+                creds = flow.run_local_server(port=0)
             
             with open(token_file, 'w') as f:
                 f.write(creds.to_json())
         
-        self.drive_service = build('drive', 'v3', credentials=creds)
+        self._creds = creds
+        self.drive_service = self._build_drive_service()
         return self.drive_service
     
+    def _build_drive_service(self):
+        """Build a Drive service bound to its own long-lived authorized transport"""
+        from googleapiclient.discovery import build
+        import google_auth_httplib2
+        import httplib2
+        
+        authed_http = google_auth_httplib2.AuthorizedHttp(self._creds, http=httplib2.Http())
+        return build('drive', 'v3', http=authed_http)
+    
+    def _thread_drive_service(self):
+        """Drive service for the current thread (httplib2 transports are not thread-safe)"""
+        if self._creds is None or threading.current_thread() is threading.main_thread():
+            return self.drive_service
+        
+        service = getattr(self._thread_local, 'drive_service', None)
+        if service is None:
+            service = self._build_drive_service()
+            self._thread_local.drive_service = service
+        return service
+    
     def setup_drive_structure(self):
         """Create organized Google Drive folder structure"""
         if not self.drive_service:
@@ -87,13 +190,13 @@ class KaggleDriveCLI:
                 return False
         
         # Get folder structure from config
-        folders = config.get_drive_folders()
+        folders = config_loader.config.get_drive_folders()
         
         print("🗂️  Setting up Google Drive folder structure...")
         
-        for folder_path in folders.keys():
-            folder_id = self.create_drive_folder(folder_path)
-            folders[folder_path] = folder_id
+        # Always check Drive here: saved IDs may point at deleted or trashed folders
+        folders.update(self.create_drive_folders(list(folders), refresh=True))
+        for folder_path in folders:
             print(f"✅ Created: {folder_path}")
         
         # Save folder IDs to config
@@ -102,65 +205,151 @@ class KaggleDriveCLI:
             "created_at": datetime.now().isoformat()
         }
         
-        with open(self.drive_config, 'w') as f:
+        # Write atomically so an interrupted setup cannot leave an empty file
+        tmp_file = self.drive_config.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
             json.dump(drive_config, f, indent=2)
+        os.replace(tmp_file, self.drive_config)
         
         print("✅ Drive structure setup complete!")
         return True
     
     def create_drive_folder(self, folder_path: str) -> str:
         """Create folder in Google Drive with full path"""
-        parts = folder_path.split('/')
-        parent_id = None
-        
-        for part in parts:
-            # Check if folder exists
-            query = f"name='{part}' and mimeType='application/vnd.google-apps.folder'"
-            if parent_id:
-                query += f" and '{parent_id}' in parents"
-            else:
-                query += " and 'root' in parents"
+        return self.create_drive_folders([folder_path])[folder_path]
+    
+    def create_drive_folders(self, folder_paths: List[str], refresh: bool = False) -> Dict[str, str]:
+        """Resolve or create several Drive folder paths, returning path -> folder ID
+        (refresh: ignore saved IDs and re-check every path against Drive)"""
+        cache = {} if refresh else self._drive_folders
+        if not refresh and all(folder_path in cache for folder_path in folder_paths):
+            return {folder_path: cache[folder_path] for folder_path in folder_paths}
+        
+        # Every prefix of every path, grouped by depth so parents exist before children
+        levels: Dict[int, set] = {}
+        for folder_path in folder_paths:
+            parts = folder_path.split('/')
+            for depth in range(1, len(parts) + 1):
+                levels.setdefault(depth, set()).add('/'.join(parts[:depth]))
+        
+        # Resolved IDs (including intermediate parents) are kept in the cache;
+        # each depth costs one query for just the folders still unresolved
+        created_ids = set()
+        for depth in sorted(levels):
+            wanted = []
+            missing = []
+            for path in sorted(levels[depth]):
+                if path in cache:
+                    continue
+                parent_path, _, name = path.rpartition('/')
+                parent_id = cache[parent_path] if parent_path else 'root'
+                # Folders created in this run have no children to look up
+                if parent_id in created_ids:
+                    missing.append((path, name, parent_id))
+                else:
+                    wanted.append((path, name, parent_id))
+            
+            if wanted:
+                index = self._find_child_folders({parent_id for _, _, parent_id in wanted},
+                                                 {name for _, name, _ in wanted})
+                for path, name, parent_id in wanted:
+                    folder_id = index.get((parent_id, name))
+                    if folder_id:
+                        cache[path] = folder_id
+                    else:
+                        missing.append((path, name, parent_id))
+            
+            for i in range(0, len(missing), DRIVE_BATCH_LIMIT):
+                created = self._batch_create_folders(missing[i:i + DRIVE_BATCH_LIMIT])
+                cache.update(created)
+                created_ids.update(created.values())
+        
+        if refresh:
+            self._drive_folders.update(cache)
+        return {folder_path: cache[folder_path] for folder_path in folder_paths}
+    
+    def _find_child_folders(self, parent_ids: set, names: set) -> Dict[tuple, str]:
+        """Find named folders directly under the given parents, returning {(parent_id, name): id}
+        ('root' may be used as a parent ID for top-level folders)"""
+        def quote(value: str) -> str:
+            return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+        
+        parents_clause = " or ".join(f"{quote(parent_id)} in parents" for parent_id in sorted(parent_ids))
+        names_clause = " or ".join(f"name={quote(name)}" for name in sorted(names))
+        query = (f"mimeType='{FOLDER_MIME_TYPE}' and ({parents_clause}) and ({names_clause}) "
+                 "and trashed=false")
+        
+        index = {}
+        page_token = None
+        while True:
+            results = self.drive_service.files().list(
+                q=query,
+                fields='nextPageToken, files(id, name, parents)',
+                pageSize=1000,
+                pageToken=page_token
+            ).execute()
             
-            results = self.drive_service.files().list(q=query).execute()
-            items = results.get('files', [])
+            for item in results.get('files', []):
+                item_parents = set(item.get('parents', []))
+                # Drive reports the real root ID, which was queried through the 'root' alias
+                matched = (item_parents & parent_ids) or ({'root'} & parent_ids)
+                for parent_id in matched:
+                    index.setdefault((parent_id, item['name']), item['id'])
             
-            if items:
-                parent_id = items[0]['id']
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        return index
+    
+    def _batch_create_folders(self, folders: List[tuple]) -> Dict[str, str]:
+        """Create (path, name, parent_id) folders in a single batch request"""
+        created = {}
+        errors = []
+        
+        def on_created(request_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
             else:
-                # Create folder
-                folder_metadata = {
-                    'name': part,
-                    'mimeType': 'application/vnd.google-apps.folder'
-                }
-                if parent_id:
-                    folder_metadata['parents'] = [parent_id]
-                
-                folder = self.drive_service.files().create(body=folder_metadata).execute()
-                parent_id = folder['id']
+                created[request_id] = response['id']
+        
+        batch = self.drive_service.new_batch_http_request(callback=on_created)
+        for path, name, parent_id in folders:
+            folder_metadata = {
+                'name': name,
+                'mimeType': FOLDER_MIME_TYPE,
+                'parents': [parent_id]
+            }
+            batch.add(self.drive_service.files().create(body=folder_metadata, fields='id'),
+                      request_id=path)
+        batch.execute()
         
-        return parent_id
+        if errors:
+            raise errors[0]
+        return created
+    
+    def iter_kaggle_kernels(self) -> Iterator[Dict]:
+        """Stream Kaggle kernels as the kaggle CLI prints them"""
+        # -v emits CSV: ref,title,author,lastRunTime,totalVotes
+        with subprocess.Popen(['kaggle', 'kernels', 'list', '--mine', '-v'],
+                              stdout=subprocess.PIPE, text=True) as proc:
+            for row in csv.DictReader(proc.stdout):
+                if row.get('ref'):
+                    yield {
+                        'name': row['ref'],
+                        'title': row.get('title', ''),
+                        'author': row.get('author', ''),
+                        'last_run': row.get('lastRunTime', ''),
+                        'votes': row.get('totalVotes', '')
+                    }
+        
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
     
     def list_kaggle_kernels(self) -> List[Dict]:
         """List all Kaggle kernels"""
         try:
-            result = subprocess.run(['kaggle', 'kernels', 'list', '--mine'], 
-                                  capture_output=True, text=True, check=True)
-            
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            kernels = []
-            
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        kernels.append({
-                            'name': parts[0],
-                            'title': ' '.join(parts[1:-2]),
-                            'language': parts[-2],
-                            'type': parts[-1]
-                        })
-            
-            return kernels
+            return list(self.iter_kaggle_kernels())
         except subprocess.CalledProcessError as e:
             print(f"❌ Error listing Kaggle kernels: {e}")
             return []
@@ -185,50 +374,122 @@ class KaggleDriveCLI:
             if not project_folder:
                 project_folder = self.get_drive_folder_id("Kaggle-CLI/Outputs")
             
-            uploaded_files = []
-            for file_path in output_dir.rglob('*'):
-                if file_path.is_file():
-                    file_id = self.upload_to_drive(str(file_path), project_folder)
-                    if file_id:
-                        uploaded_files.append({
-                            'name': file_path.name,
-                            'id': file_id,
-                            'uploaded_at': datetime.now().isoformat()
-                        })
+            # Files whose content matches the last sync to this folder are not re-uploaded
+            previous_files = {}
+            previous_sync = self.metadata['kaggle_kernels'].get(kernel_name, {})
+            if previous_sync.get('drive_folder') == project_folder:
+                previous_files = {f['path']: f for f in previous_sync.get('files', []) if 'path' in f}
+            
+            synced_files = []
+            uploaded_count = 0
+            failed_count = 0
+            with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+                futures = []
+                for file_path, relative_path in iter_files(output_dir):
+                    futures.append(executor.submit(
+                        self._sync_output_file, file_path, relative_path,
+                        previous_files.get(relative_path), project_folder
+                    ))
+                
+                for future in as_completed(futures):
+                    record, uploaded, failed = future.result()
+                    if record:
+                        synced_files.append(record)
+                    uploaded_count += uploaded
+                    failed_count += failed
             
             # Update metadata
             self.metadata['kaggle_kernels'][kernel_name] = {
                 'last_sync': datetime.now().isoformat(),
-                'files': uploaded_files,
+                'files': synced_files,
                 'drive_folder': project_folder
             }
             
             self.metadata['sync_history'].append({
                 'type': 'kernel_sync',
                 'kernel': kernel_name,
-                'files_count': len(uploaded_files),
+                'files_count': uploaded_count,
                 'timestamp': datetime.now().isoformat()
             })
             
+            # Keep only the most recent entries so metadata writes stay bounded
+            if self.history_limit:
+                del self.metadata['sync_history'][:-self.history_limit]
+            
             self.save_metadata()
             
-            print(f"✅ Synced {len(uploaded_files)} files from {kernel_name}")
+            if failed_count:
+                print(f"❌ Failed to sync {failed_count} files from {kernel_name} "
+                      f"({uploaded_count} uploaded); re-run sync to retry")
+                return False
+            
+            unchanged_count = len(synced_files) - uploaded_count
+            print(f"✅ Synced {uploaded_count} files from {kernel_name} ({unchanged_count} unchanged)")
             return True
             
         except subprocess.CalledProcessError as e:
             print(f"❌ Error syncing kernel {kernel_name}: {e}")
             return False
     
-    def upload_to_drive(self, file_path: str, parent_folder_id: str) -> Optional[str]:
-        """Upload file to Google Drive"""
+    def _sync_output_file(self, file_path: str, relative_path: str,
+                          previous: Optional[Dict], parent_folder_id: str):
+        """Upload one output file unless it matches the previous sync, returning (record, uploaded, failed)"""
+        stat = os.stat(file_path)
+        record = {
+            'name': os.path.basename(file_path),
+            'path': relative_path,
+            'hash': file_digest(file_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime
+        }
+        
+        if previous and previous.get('hash') == record['hash']:
+            record['id'] = previous['id']
+            record['uploaded_at'] = previous.get('uploaded_at')
+            return record, False, False
+        
+        # Replace the previous Drive copy in place rather than adding a duplicate
+        file_id = self.upload_to_drive(file_path, parent_folder_id,
+                                       file_id=previous.get('id') if previous else None)
+        if not file_id:
+            # Keep the previous record so the next sync retries against the same Drive file
+            return previous, False, True
+        
+        record['id'] = file_id
+        record['uploaded_at'] = datetime.now().isoformat()
+        return record, True, False
+    
+    def upload_to_drive(self, file_path: str, parent_folder_id: str,
+                        file_id: Optional[str] = None) -> Optional[str]:
+        """Upload file to Google Drive (file_id: existing Drive file to overwrite)"""
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import MediaFileUpload
+        
         try:
+            service = self._thread_drive_service()
+            
+            # Small files go up in a single request; resumable sessions cost an extra round trip
+            resumable = os.path.getsize(file_path) > self.simple_upload_max_size
+            
+            if file_id:
+                try:
+                    media = MediaFileUpload(file_path, resumable=resumable)
+                    file = service.files().update(
+                        fileId=file_id, media_body=media, fields='id'
+                    ).execute()
+                    return file['id']
+                except HttpError as e:
+                    # Previous copy was deleted on Drive; upload a new one instead
+                    if e.resp.status != 404:
+                        raise
+            
             file_metadata = {
                 'name': os.path.basename(file_path),
                 'parents': [parent_folder_id]
             }
             
-            media = MediaFileUpload(file_path, resumable=True)
-            file = self.drive_service.files().create(
+            media = MediaFileUpload(file_path, resumable=resumable)
+            file = service.files().create(
                 body=file_metadata, media_body=media, fields='id'
             ).execute()
             
@@ -239,44 +500,57 @@ class KaggleDriveCLI:
     
     def download_from_drive(self, file_id: str, destination: str):
         """Download file from Google Drive"""
+        from googleapiclient.http import MediaIoBaseDownload
+        
+        # Stream into a temp file next to the destination so a failed download
+        # leaves any existing file untouched
+        tmp_file = f"{destination}.{os.getpid()}.part"
         try:
             request = self.drive_service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
             
-            with open(destination, 'wb') as f:
-                f.write(fh.getvalue())
+            # Stream chunks straight to disk rather than buffering in memory
+            with open(tmp_file, 'wb') as f:
+                downloader = MediaIoBaseDownload(f, request, chunksize=self.download_chunk_size)
+                
+                done = False
+                while done is False:
+                    status, done = downloader.next_chunk()
             
+            os.replace(tmp_file, destination)
             return True
         except Exception as e:
             print(f"❌ Error downloading file: {e}")
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
             return False
     
     def get_drive_folder_id(self, folder_path: str) -> Optional[str]:
         """Get Google Drive folder ID from path"""
-        if self.drive_config.exists():
-            with open(self.drive_config, 'r') as f:
-                config = json.load(f)
-                return config.get('folder_structure', {}).get(folder_path)
-        return None
+        return self._drive_folders.get(folder_path)
     
     def status(self):
         """Show current status of Kaggle kernels and Drive sync"""
         print("📊 KAGGLE + DRIVE STATUS")
         print("=" * 50)
         
-        # Kaggle kernels
-        kernels = self.list_kaggle_kernels()
-        print(f"🔬 Kaggle Kernels: {len(kernels)}")
-        for kernel in kernels[:5]:  # Show first 5
-            print(f"   • {kernel['name']} ({kernel['language']})")
+        # Kaggle kernels (only the displayed ones are kept in memory)
+        max_display = self.output_settings.get('max_kernels_display', 5)
+        try:
+            kernels = self.iter_kaggle_kernels()
+            shown = list(itertools.islice(kernels, max_display))
+            remaining = sum(1 for _ in kernels)
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error listing Kaggle kernels: {e}")
+            shown, remaining = [], 0
+        
+        print(f"🔬 Kaggle Kernels: {len(shown) + remaining}")
+        for kernel in shown:
+            print(f"   • {kernel['name']} (last run: {kernel['last_run'] or 'never'})")
         
-        if len(kernels) > 5:
-            print(f"   ... and {len(kernels) - 5} more")
+        if remaining:
+            print(f"   ... and {remaining} more")
         
         # Drive sync status
         synced_kernels = len(self.metadata['kaggle_kernels'])
@@ -357,7 +631,7 @@ def main():
         project_folder_id = pm.create_project_structure(projects_folder_id, args.project)
         
         # Create project config
-        project_config = pm.create_project_config(
+        project_config, config_text = pm.create_project_config(
             args.project, 
             args.username,
             args.description or "",
@@ -365,7 +639,7 @@ def main():
         )
         
         # Save config to Drive
-        config_file_id = pm.save_project_config(project_config, project_folder_id)
+        config_file_id = pm.save_project_config(project_config, project_folder_id, config_text, new=True)
         
         print(f"✅ Project created successfully!")
         print(f"   Folder ID: {project_folder_id}")
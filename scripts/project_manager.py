@@ -4,127 +4,279 @@ Project Configuration Manager
 Handles individual project configs stored on Google Drive
 """
 
+import os
 import yaml
 import json
+import copy
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
 from string import Template
 
 from config_loader import get_path, get_config
 
+# Prefer the LibYAML-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CONFIG_CACHE_SIZE = 256  # parsed project configs kept in memory
+PARENTS_PER_QUERY = 50   # folder IDs per Drive query (keeps the URL short)
+
+# Parsed configs persisted between runs
+CONFIG_CACHE_FILE = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'project_manager' / 'configs.json'
+
+# Characters mapped to '-' in kernel slugs
+SLUG_TABLE = str.maketrans({' ': '-', '_': '-'})
+
+# Required config fields, pre-split into key paths
+REQUIRED_FIELDS = tuple(tuple(field.split('.')) for field in (
+    'project.name',
+    'project.kaggle_username',
+    'kaggle.kernel_id'
+))
+
+def parse_config(content) -> Any:
+    """Parse a project config: JSON fast path, YAML for older or hand-edited configs"""
+    try:
+        return orjson.loads(content) if orjson is not None else json.loads(content)
+    except ValueError:
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return yaml.load(content, Loader=SafeLoader)
+
+def dump_config(project_config: Dict[str, Any]) -> str:
+    """Serialize a project config as indented JSON"""
+    if orjson is not None:
+        return orjson.dumps(project_config, default=str, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(project_config, indent=2, default=str)
+
+def deep_merge(base: dict, updates: dict):
+    """Recursively merge updates into base in place (iterative, no recursion)"""
+    stack = [(base, updates)]
+    while stack:
+        base_dict, update_dict = stack.pop()
+        for key, value in update_dict.items():
+            base_value = base_dict.get(key)
+            if isinstance(base_value, dict) and isinstance(value, dict):
+                stack.append((base_value, value))
+            else:
+                base_dict[key] = value
+
 class ProjectManager:
     def __init__(self, drive_service):
         self.drive_service = drive_service
-        self.template_path = get_path('paths.templates_dir') / 'project_config.yaml'
+        self.template_path = get_path('paths.templates_dir') / 'project_config.json'
+        self._template: Optional[Template] = None
+        self._template_mtime: Optional[int] = None
+        
+        # Parsed configs keyed by (file ID, modifiedTime), least recently used first
+        self._cfg_cache: OrderedDict = self._read_cache_file()
+        self._cfg_cache_dirty = False
+        # Drive folder ID -> ID of its project_config.yaml
+        self._config_file_ids: Dict[str, str] = {}
     
     def create_project_config(self, 
                             project_name: str,
                             kaggle_username: str,
                             project_description: str = "",
-                            drive_folder_id: str = None) -> Dict[str, Any]:
-        """Create a new project configuration from template"""
+                            drive_folder_id: str = None) -> Tuple[Dict[str, Any], str]:
+        """Create a new project configuration from template, returning (config, rendered text)"""
         
-        # Load template
-        with open(self.template_path, 'r') as f:
-            template_content = f.read()
+        # Load template (re-read only when the file changes)
+        template_mtime = self.template_path.stat().st_mtime_ns
+        if template_mtime != self._template_mtime:
+            self._template = Template(self.template_path.read_text())
+            self._template_mtime = template_mtime
         
         # Generate values
-        kernel_slug = project_name.lower().replace(' ', '-').replace('_', '-')
+        kernel_slug = project_name.lower().translate(SLUG_TABLE)
         created_date = datetime.now().isoformat()
         
-        # Replace template variables
-        template = Template(template_content)
-        config_content = template.substitute(
-            project_name=project_name,
-            project_description=project_description or f"Machine learning project: {project_name}",
-            created_date=created_date,
-            kaggle_username=kaggle_username,
-            kernel_slug=kernel_slug,
-            drive_folder_id=drive_folder_id or "TBD"
+        # Replace template variables (escaped, since they land inside JSON strings)
+        values = {
+            'project_name': project_name,
+            'project_description': project_description or f"Machine learning project: {project_name}",
+            'created_date': created_date,
+            'kaggle_username': kaggle_username,
+            'kernel_slug': kernel_slug,
+            'drive_folder_id': drive_folder_id or "TBD"
+        }
+        config_content = self._template.substitute(
+            {name: json.dumps(value)[1:-1] for name, value in values.items()}
         )
         
-        # Parse as YAML
-        project_config = yaml.safe_load(config_content)
+        project_config = parse_config(config_content)
         
-        return project_config
+        return project_config, config_content
     
-    def save_project_config(self, project_config: Dict[str, Any], drive_folder_id: str) -> str:
-        """Save project config to Google Drive"""
-        
-        # Convert config to YAML
-        config_yaml = yaml.dump(project_config, default_flow_style=False, indent=2)
-        
-        # Create temp file
-        temp_file = Path("/tmp/project_config.yaml")
-        with open(temp_file, 'w') as f:
-            f.write(config_yaml)
-        
-        # Upload to Drive
-        file_metadata = {
-            'name': 'project_config.yaml',
-            'parents': [drive_folder_id]
-        }
-        
-        from googleapiclient.http import MediaFileUpload
-        media = MediaFileUpload(str(temp_file), mimetype='text/yaml')
-        
-        file = self.drive_service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
-        
-        # Clean up temp file
-        temp_file.unlink()
-        
+    def save_project_config(self, project_config: Dict[str, Any], drive_folder_id: str,
+                            config_text: Optional[str] = None, new: bool = False) -> str:
+        """Save project config to Google Drive (config_text: already-rendered text to upload as is;
+        new: the folder was just created, so there is no existing config to look up)"""
+        
+        # Serialize as JSON, which YAML readers still accept
+        if config_text is None:
+            config_text = dump_config(project_config)
+        
+        # Small payload: upload from memory in a single (non-resumable) request
+        from googleapiclient.http import MediaInMemoryUpload
+        media = MediaInMemoryUpload(config_text.encode('utf-8'), mimetype='application/json', resumable=False)
+        
+        # Replace the folder's existing config in place rather than adding a duplicate
+        existing_file_id = self._config_file_ids.get(drive_folder_id)
+        if not existing_file_id and not new:
+            existing_file_id = self._find_config_file_id(drive_folder_id)
+        if existing_file_id:
+            file = self.drive_service.files().update(
+                fileId=existing_file_id,
+                media_body=media,
+                fields='id, modifiedTime'
+            ).execute()
+        else:
+            file_metadata = {
+                'name': 'project_config.yaml',
+                'parents': [drive_folder_id]
+            }
+            file = self.drive_service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id, modifiedTime'
+            ).execute()
+        
+        # Write through so the next load of this version skips the download
+        self._invalidate_config(drive_folder_id)
+        self._config_file_ids[drive_folder_id] = file['id']
+        self._cache_config((file['id'], file.get('modifiedTime')), project_config)
+        self._write_cache_file()
         return file['id']
     
     def load_project_config(self, drive_folder_id: str) -> Optional[Dict[str, Any]]:
         """Load project config from Google Drive folder"""
         
         # Search for project_config.yaml in the folder
-        query = f"name='project_config.yaml' and '{drive_folder_id}' in parents"
-        results = self.drive_service.files().list(q=query).execute()
+        query = f"name='project_config.yaml' and '{drive_folder_id}' in parents and trashed=false"
+        results = self.drive_service.files().list(
+            q=query,
+            fields='files(id, modifiedTime)',
+            pageSize=10,
+            spaces='drive'
+        ).execute()
         files = results.get('files', [])
         
         if not files:
             return None
         
-        # Download the config file
-        file_id = files[0]['id']
-        
-        from googleapiclient.http import MediaIoBaseDownload
-        import io
-        
-        request = self.drive_service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
+        config_file = files[0]
+        self._config_file_ids[drive_folder_id] = config_file['id']
+        project_config = self._load_config_file(config_file['id'], config_file.get('modifiedTime'))
+        self._write_cache_file()
+        return project_config
+    
+    def _find_config_file_id(self, drive_folder_id: str) -> Optional[str]:
+        """Look up the ID of a folder's project_config.yaml (no download)"""
+        query = f"name='project_config.yaml' and '{drive_folder_id}' in parents and trashed=false"
+        results = self.drive_service.files().list(
+            q=query,
+            fields='files(id)',
+            pageSize=1,
+            spaces='drive'
+        ).execute()
+        files = results.get('files', [])
         
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
+        if not files:
+            return None
         
-        # Parse YAML
-        config_content = fh.getvalue().decode('utf-8')
-        return yaml.safe_load(config_content)
+        self._config_file_ids[drive_folder_id] = files[0]['id']
+        return files[0]['id']
+    
+    def _load_config_file(self, file_id: str, modified_time: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Download and parse a config file, served from cache while unmodified"""
+        key = (file_id, modified_time)
+        cached = self._cfg_cache.get(key)
+        if cached is not None:
+            self._cfg_cache.move_to_end(key)
+            return copy.deepcopy(cached)
+        
+        # Configs are small, so fetch the whole body in one request
+        config_bytes = self.drive_service.files().get_media(fileId=file_id).execute()
+        project_config = parse_config(config_bytes)
+        
+        self._cache_config(key, project_config)
+        return project_config
+    
+    def _cache_config(self, key: tuple, project_config: Dict[str, Any]):
+        """Store a private copy of a parsed config, evicting the least recently used"""
+        self._cfg_cache[key] = copy.deepcopy(project_config)
+        self._cfg_cache.move_to_end(key)
+        while len(self._cfg_cache) > CONFIG_CACHE_SIZE:
+            self._cfg_cache.popitem(last=False)
+        self._cfg_cache_dirty = True
     
-    def update_project_config(self, drive_folder_id: str, updates: Dict[str, Any]) -> bool:
-        """Update existing project config"""
+    def _invalidate_config(self, drive_folder_id: str):
+        """Drop cached configs for a folder's config file"""
+        file_id = self._config_file_ids.get(drive_folder_id)
+        for key in [key for key in self._cfg_cache if key[0] == file_id]:
+            del self._cfg_cache[key]
+            self._cfg_cache_dirty = True
+    
+    def _read_cache_file(self) -> OrderedDict:
+        """Load configs cached by previous runs"""
+        try:
+            with open(CONFIG_CACHE_FILE, 'rb') as f:
+                data = f.read()
+            entries = orjson.loads(data) if orjson is not None else json.loads(data)
+            return OrderedDict(((file_id, modified_time), config) for file_id, modified_time, config in entries)
+        except (OSError, TypeError, ValueError):
+            return OrderedDict()
+    
+    def _write_cache_file(self):
+        """Persist the config cache if it changed (best effort, atomic replace)"""
+        if not self._cfg_cache_dirty:
+            return
+        
+        entries = [[file_id, modified_time, config] for (file_id, modified_time), config in self._cfg_cache.items()]
+        if orjson is not None:
+            data = orjson.dumps(entries, default=str)
+        else:
+            data = json.dumps(entries, default=str).encode('utf-8')
+        
+        tmp_file = CONFIG_CACHE_FILE.with_name(f"{CONFIG_CACHE_FILE.name}.{os.getpid()}.tmp")
+        try:
+            CONFIG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, CONFIG_CACHE_FILE)
+            self._cfg_cache_dirty = False
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+    
+    def update_project_config(self, drive_folder_id: str, updates: Dict[str, Any],
+                              current_config: Optional[Dict[str, Any]] = None,
+                              file_id: Optional[str] = None) -> bool:
+        """Update existing project config (pass current_config/file_id to skip re-downloading it)"""
+        
+        if file_id:
+            self._config_file_ids[drive_folder_id] = file_id
         
         # Load current config
-        current_config = self.load_project_config(drive_folder_id)
+        if current_config is None:
+            current_config = self.load_project_config(drive_folder_id)
+        elif drive_folder_id not in self._config_file_ids:
+            # Caller supplied the config but not its file: find it so it gets updated in place
+            if not self._find_config_file_id(drive_folder_id):
+                return False
         if not current_config:
             return False
         
         # Apply updates (deep merge)
-        def deep_merge(base: dict, updates: dict):
-            for key, value in updates.items():
-                if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                    deep_merge(base[key], value)
-                else:
-                    base[key] = value
-        
         deep_merge(current_config, updates)
         
         # Save updated config
@@ -135,14 +287,29 @@ class ProjectManager:
         """List all projects (folders with project_config.yaml)"""
         
         # Get all folders in the Projects directory
-        query = f"mimeType='application/vnd.google-apps.folder' and '{root_folder_id}' in parents"
-        results = self.drive_service.files().list(q=query).execute()
-        folders = results.get('files', [])
+        query = (f"mimeType='application/vnd.google-apps.folder' and '{root_folder_id}' in parents "
+                 "and trashed=false")
+        folders = list(self._list_files(query, 'id, name'))
+        folder_ids = [folder['id'] for folder in folders]
+        
+        # Find project configs for many folders per query ('a' in parents or 'b' in parents ...)
+        config_files = {}
+        for i in range(0, len(folder_ids), PARENTS_PER_QUERY):
+            chunk = folder_ids[i:i + PARENTS_PER_QUERY]
+            parents = " or ".join(f"'{folder_id}' in parents" for folder_id in chunk)
+            query = f"name='project_config.yaml' and ({parents}) and trashed=false"
+            for config_file in self._list_files(query, 'id, parents, modifiedTime'):
+                for parent_id in config_file.get('parents', []):
+                    config_files.setdefault(parent_id, config_file)
         
         projects = []
         for folder in folders:
-            # Check if folder has a project config
-            config = self.load_project_config(folder['id'])
+            config_file = config_files.get(folder['id'])
+            if not config_file:
+                continue
+            
+            self._config_file_ids[folder['id']] = config_file['id']
+            config = self._load_config_file(config_file['id'], config_file.get('modifiedTime'))
             if config:
                 projects.append({
                     'name': folder['name'],
@@ -150,8 +317,27 @@ class ProjectManager:
                     'config': config
                 })
         
+        self._write_cache_file()
         return projects
     
+    def _list_files(self, query: str, file_fields: str) -> Iterator[Dict[str, Any]]:
+        """Yield every file matching a Drive query, following pagination"""
+        page_token = None
+        while True:
+            results = self.drive_service.files().list(
+                q=query,
+                fields=f'nextPageToken, files({file_fields})',
+                pageSize=1000,
+                spaces='drive',
+                pageToken=page_token
+            ).execute()
+            
+            yield from results.get('files', [])
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+    
     def create_project_structure(self, parent_folder_id: str, project_name: str) -> str:
         """Create project folder structure on Google Drive"""
         
@@ -168,13 +354,25 @@ class ProjectManager:
         # Create subfolders based on template structure
         subfolders = ['code', 'data', 'outputs', 'docs', 'notebooks']
         
+        # Metadata-only creates can share one batch request (one round trip)
+        errors = []
+        
+        def on_created(request_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
+        
+        batch = self.drive_service.new_batch_http_request(callback=on_created)
         for subfolder in subfolders:
             subfolder_metadata = {
                 'name': subfolder,
                 'mimeType': 'application/vnd.google-apps.folder',
                 'parents': [project_folder_id]
             }
-            self.drive_service.files().create(body=subfolder_metadata).execute()
+            batch.add(self.drive_service.files().create(body=subfolder_metadata, fields='id'))
+        batch.execute()
+        
+        if errors:
+            raise errors[0]
         
         return project_folder_id
     
@@ -183,20 +381,13 @@ class ProjectManager:
         errors = []
         
         # Required fields
-        required_fields = [
-            'project.name',
-            'project.kaggle_username',
-            'kaggle.kernel_id'
-        ]
-        
-        for field in required_fields:
-            keys = field.split('.')
+        for keys in REQUIRED_FIELDS:
             current = config
-            for key in keys:
-                if not isinstance(current, dict) or key not in current:
-                    errors.append(f"Missing required field: {field}")
-                    break
-                current = current[key]
+            try:
+                for key in keys:
+                    current = current[key]
+            except (KeyError, TypeError):
+                errors.append(f"Missing required field: {'.'.join(keys)}")
         
         # Validate kernel_id format
         kernel_id = config.get('kaggle', {}).get('kernel_id', '')
@@ -0,0 +1,55 @@
+#!/bin/bash
+# Kaggle CLI Automation Script
+# Runs your code on Kaggle's free compute and downloads results
+
+set -e
+
+PROJECT_NAME="${project_name}"
+KERNEL_ID="${kernel_id}"
+
+echo "STARTING: Kaggle automation workflow..."
+
+# Push kernel to Kaggle
+echo "UPLOAD: Pushing to Kaggle..."
+kaggle kernels push
+
+# Wait for execution to start
+echo "WAITING: Waiting for kernel to start..."
+sleep 30
+
+# Monitor status
+echo "MONITORING: Monitoring kernel status..."
+while true; do
+    STATUS=$(kaggle kernels status $KERNEL_ID --quiet | tail -1)
+    echo "Status: $STATUS"
+    
+    if [[ "$STATUS" == *"complete"* ]]; then
+        echo "SUCCESS: Kernel completed successfully!"
+        break
+    elif [[ "$STATUS" == *"error"* ]] || [[ "$STATUS" == *"failed"* ]]; then
+        echo "ERROR: Kernel failed!"
+        exit 1
+    fi
+    
+    echo "Still running... checking again in 60 seconds"
+    sleep 60
+done
+
+# Download outputs
+echo "DOWNLOAD: Downloading outputs..."
+mkdir -p out
+kaggle kernels output $KERNEL_ID -p out/
+
+# List downloaded files
+echo "FILES: Downloaded files:"
+ls -la out/
+
+# Upload to Google Drive (optional)
+if [ -f "credentials.json" ]; then
+    echo "UPLOAD: Uploading to Google Drive..."
+    python upload-to-drive.py
+else
+    echo "WARNING: Skipping Google Drive upload (no credentials.json found)"
+fi
+
+echo "SUCCESS: Workflow complete!"
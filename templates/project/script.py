@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Your main ML/Data Science script
+This runs on Kaggle's free GPU/TPU compute
+"""
+
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+def main():
+    print("STARTING: Kaggle automation script...")
+    
+    # Your ML code here
+    # Example: Load data, train model, generate outputs
+    
+    # Save results to be downloaded
+    results = {"status": "completed", "accuracy": 0.95}
+    pd.DataFrame([results]).to_csv("results.csv", index=False)
+    
+    print("SUCCESS: Script completed successfully!")
+    print("Results saved to results.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Upload Kaggle outputs to Google Drive
+Requires Google Cloud credentials.json
+"""
+
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import random
+import time
+import os
+
+SCOPES = ['https://www.googleapis.com/auth/drive.file']
+MAX_WORKERS = int(os.environ.get('DRIVE_UPLOAD_CONCURRENCY', '4'))
+MAX_RETRIES = 5
+SIMPLE_UPLOAD_MAX_SIZE = 5 * 1024 * 1024  # smaller files skip the resumable session
+
+_thread_local = threading.local()
+
+def authenticate():
+    """Authenticate with Google Drive API"""
+    creds = None
+    if os.path.exists('token.json'):
+        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+    else:
+        if not os.path.exists('credentials.json'):
+            print("ERROR: credentials.json not found!")
+            print("Download it from Google Cloud Console:")
+            print("https://console.cloud.google.com/apis/credentials")
+            return None
+        
+        flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
+        creds = flow.run_local_server(port=0)
+        with open('token.json', 'w') as f:
+            f.write(creds.to_json())
+    return creds
+
+def get_service(creds):
+    """Drive service for the current thread (httplib2 transports are not thread-safe)"""
+    service = getattr(_thread_local, 'service', None)
+    if service is None:
+        service = _thread_local.service = build('drive', 'v3', credentials=creds)
+    return service
+
+def is_rate_limited(error):
+    """True for 429 and 403 rate-limit errors, which are worth retrying"""
+    status = error.resp.status
+    return status == 429 or (status == 403 and b'ratelimitexceeded' in error.content.lower())
+
+def upload_file(service, filepath, parent_folder_id=None):
+    """Upload a single file to Google Drive, backing off on rate limits"""
+    file_metadata = {'name': os.path.basename(filepath)}
+    if parent_folder_id:
+        file_metadata['parents'] = [parent_folder_id]
+
+    # Resumable uploads cost an extra round trip per file; only large files need them
+    resumable = os.path.getsize(filepath) > SIMPLE_UPLOAD_MAX_SIZE
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            media = MediaFileUpload(filepath, resumable=resumable)
+            file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+            break
+        except HttpError as e:
+            if not is_rate_limited(e) or attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt + random.random())
+    print(f"UPLOAD: Uploaded {filepath} -> File ID: {file['id']}")
+
+def main():
+    """Upload all files in out/ directory to Google Drive"""
+    creds = authenticate()
+    if not creds:
+        return
+    
+    out_dir = 'out'
+    if not os.path.exists(out_dir):
+        print(f"ERROR: {out_dir} directory not found!")
+        return
+    
+    files = os.listdir(out_dir)
+    if not files:
+        print(f"WARNING: No files found in {out_dir}/")
+        return
+    
+    print(f"UPLOAD: Uploading {len(files)} files to Google Drive...")
+    filepaths = [os.path.join(out_dir, filename) for filename in files]
+    filepaths = [filepath for filepath in filepaths if os.path.isfile(filepath)]
+    
+    # Each worker thread uploads over its own Drive service
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(lambda p: upload_file(get_service(creds), p), filepath)
+                   for filepath in filepaths]
+        for future in futures:
+            future.result()
+    
+    print("SUCCESS: Upload complete!")
+
+if __name__ == '__main__':
+    main()
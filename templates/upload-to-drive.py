@@ -1,10 +1,22 @@
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
+from concurrent.futures import ThreadPoolExecutor
+import google_auth_httplib2
+import httplib2
+import threading
+import random
+import time
 import os
 
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
+MAX_WORKERS = int(os.environ.get('DRIVE_UPLOAD_CONCURRENCY', '4'))
+MAX_RETRIES = 5
+SIMPLE_UPLOAD_MAX_SIZE = 5 * 1024 * 1024  # smaller files skip the resumable session
+
+_thread_local = threading.local()
 
 def authenticate():
     creds = None
@@ -17,23 +29,48 @@ def authenticate():
             f.write(creds.to_json())
     return creds
 
+def get_service(creds):
+    # httplib2 is not thread-safe, so each worker thread gets its own transport
+    service = getattr(_thread_local, 'service', None)
+    if service is None:
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+        service = _thread_local.service = build('drive', 'v3', http=http)
+    return service
+
+def is_rate_limited(error):
+    status = error.resp.status
+    return status == 429 or (status == 403 and b'ratelimitexceeded' in error.content.lower())
+
 def upload_file(service, filepath, parent_folder_id=None):
     file_metadata = {'name': os.path.basename(filepath)}
     if parent_folder_id:
         file_metadata['parents'] = [parent_folder_id]
 
-    media = MediaFileUpload(filepath, resumable=True)
-    file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+    # Resumable uploads cost an extra round trip per file; only large files need them
+    resumable = os.path.getsize(filepath) > SIMPLE_UPLOAD_MAX_SIZE
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            media = MediaFileUpload(filepath, resumable=resumable)
+            file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+            break
+        except HttpError as e:
+            if not is_rate_limited(e) or attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt + random.random())
     print(f"Uploaded {filepath} -> File ID: {file['id']}")
 
 if __name__ == '__main__':
-    service = build('drive', 'v3', credentials=authenticate())
-    
+    creds = authenticate()
+
     # Upload files from out directory
     if os.path.exists('out'):
-        for filename in os.listdir('out'):
-            filepath = os.path.join('out', filename)
-            if os.path.isfile(filepath):
-                upload_file(service, filepath)
+        filepaths = [os.path.join('out', filename) for filename in os.listdir('out')]
+        filepaths = [filepath for filepath in filepaths if os.path.isfile(filepath)]
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(lambda p: upload_file(get_service(creds), p), filepath)
+                       for filepath in filepaths]
+            for future in futures:
+                future.result()
     else:
-        print("No 'out' directory found. Nothing to upload.")
\ No newline at end of file
+        print("No 'out' directory found. Nothing to upload.")